@@ -5,16 +5,28 @@ import asyncio
 import subprocess
 import time
 import os
-import psutil
+import random
+import signal
+import struct
+from concurrent.futures import ThreadPoolExecutor
 import evdev
-from evdev import InputDevice, categorize, ecodes
+import pyudev
+from evdev import InputDevice, ecodes
 from obswebsocket import obsws, requests
 
 
 LONG_PRESS_THRESHOLD = 1.0
 RECONNECT_DELAY = 2
+MAX_RECONNECT_DELAY = 30
 OBS_EXEC = "obs"
 TOGGLE_COOLDOWN = 2.0
+LONG_BITS = struct.calcsize("l") * 8
+
+# Environment for launching OBS, without our own Python paths
+_LAUNCH_ENV = {
+    k: v for k, v in os.environ.items()
+    if k not in ("PYTHONPATH", "PYTHONHOME")
+}
 
 
 def get_args():
@@ -43,55 +55,59 @@ class OBSController:
         )
         self.connected = False
         self.active_devices = {}
-        self.long_press_active = False
         self.last_toggle_time = 0
+        self._obs_pid = None
+        self._long_press_handles = {}
+        self._tasks = set()
+        self._reconnect_delay = RECONNECT_DELAY
+        self._reconnect_wakeup = asyncio.Event()
+        # obsws is not thread-safe, so keep all client calls on one thread
+        self._ws_executor = ThreadPoolExecutor(max_workers=1)
 
-    def is_obs_running(self):
-        """Check if the obs process exists and is not zombie."""
-        for proc in psutil.process_iter(['name', 'status', 'pid', 'exe']):
-            try:
-                proc_name = proc.info['name']
-                if not proc_name:
-                    continue
-
-                proc_name_lower = proc_name.lower()
-
-                # Skip this script's process
-                if proc.info['pid'] == os.getpid():
-                    continue
+    def _pid_is_obs(self, pid):
+        """Check if pid is a live obs process that is not zombie."""
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                if f.read().strip() != OBS_EXEC:
+                    return False
+            # State is the field right after the parenthesised name
+            with open(f"/proc/{pid}/stat") as f:
+                state = f.read().rpartition(")")[2].split()[0]
+        except (OSError, IndexError):
+            return False
+        return state not in ("Z", "X")
 
-                # Skip Python processes
-                if 'python' in proc_name_lower:
-                    continue
+    def is_obs_running(self):
+        """Return the PID of the running obs process, if any."""
+        if self._obs_pid and self._pid_is_obs(self._obs_pid):
+            return self._obs_pid
+        self._obs_pid = None
+        for entry in os.scandir("/proc"):
+            if entry.name.isdigit() and self._pid_is_obs(entry.name):
+                self._obs_pid = int(entry.name)
+                break
+        return self._obs_pid
 
-                # Skip our own binary (obs-remote)
-                if 'obs-remote' in proc_name_lower:
-                    continue
+    async def _run_blocking(self, func, *args):
+        """Run a blocking WebSocket call without stalling the loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._ws_executor, func, *args)
 
-                # Look for actual OBS process
-                if 'obs' in proc_name_lower:
-                    if proc.info['status'] in [
-                        psutil.STATUS_ZOMBIE,
-                        psutil.STATUS_DEAD
-                    ]:
-                        continue
-                    return proc.info['pid']
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        return None
-
-    def is_recording(self):
+    async def is_recording(self):
         """Check if OBS is currently recording."""
         if not self.connected:
             return False
         try:
-            response = self.client.call(requests.GetRecordStatus())
+            response = await self._run_blocking(
+                self.client.call,
+                requests.GetRecordStatus()
+            )
             return response.datain.get('outputActive', False)
         except Exception:
             self.connected = False
             return False
 
-    def toggle_obs_app(self):
+    async def toggle_obs_app(self):
         """Launch or close OBS with cooldown."""
         current_time = time.time()
         if current_time - self.last_toggle_time < TOGGLE_COOLDOWN:
@@ -101,112 +117,239 @@ class OBSController:
 
         obs_pid = self.is_obs_running()
         if obs_pid:
-            if self.is_recording():
+            if await self.is_recording():
                 print("Cannot close OBS: Recording is active.")
                 return
             print(f"Closing OBS (PID {obs_pid}) gracefully...")
             try:
-                os.kill(obs_pid, 2)
+                os.kill(obs_pid, signal.SIGINT)
             except ProcessLookupError:
-                pass
+                self._obs_pid = None
+            except OSError as e:
+                print(f"Error: Cannot close OBS: {e}")
+                return
             self.connected = False
         else:
             print("Launching OBS...")
-            clean_env = os.environ.copy()
-            clean_env.pop("PYTHONPATH", None)
-            clean_env.pop("PYTHONHOME", None)
-
             try:
-                subprocess.Popen(
+                self._obs_pid = subprocess.Popen(
                     [OBS_EXEC],
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
-                    env=clean_env,
+                    env=_LAUNCH_ENV,
                     start_new_session=True
-                )
+                ).pid
                 self.connected = False
+                self._wake_reconnect()
             except FileNotFoundError:
                 print(f"Error: Command '{OBS_EXEC}' not found.")
+            except OSError as e:
+                print(f"Error: Cannot launch '{OBS_EXEC}': {e}")
+
+    def _wake_reconnect(self):
+        """Retry the WebSocket connection soon, dropping any backoff."""
+        self._reconnect_delay = RECONNECT_DELAY
+        self._reconnect_wakeup.set()
+
+    async def _wait_reconnect(self, timeout):
+        """Sleep until timeout or until _wake_reconnect is called."""
+        try:
+            await asyncio.wait_for(self._reconnect_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._reconnect_wakeup.clear()
 
     async def connect_obs(self):
         """Maintain the background WebSocket connection."""
+        unreachable = False
         while True:
             if not self.connected:
                 try:
-                    self.client.connect()
+                    await self._run_blocking(self.client.connect)
                     self.connected = True
+                    self._reconnect_delay = RECONNECT_DELAY
+                    unreachable = False
                     print("Connected to OBS WebSocket.")
-                except Exception:
-                    pass
-            await asyncio.sleep(RECONNECT_DELAY)
+                except Exception as e:
+                    if not unreachable:
+                        print(f"OBS WebSocket unreachable ({e}), retrying.")
+                        unreachable = True
+                    delay = self._reconnect_delay
+                    self._reconnect_delay = min(
+                        delay * 2,
+                        MAX_RECONNECT_DELAY
+                    )
+                    await self._wait_reconnect(
+                        delay * random.uniform(0.8, 1.2)
+                    )
+                    continue
+            await self._wait_reconnect(RECONNECT_DELAY)
+
+    def _spawn(self, coro):
+        """Run coro in the background, holding a reference until done."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _fire_long_press(self, path):
+        """Trigger at exactly the 1s mark while the key is still held."""
+        self._long_press_handles.pop(path, None)
+        print("Hold detected: Toggling OBS Application.")
+        self._spawn(self.toggle_obs_app())
+
+    def _cancel_long_press(self, path):
+        """Drop the long-press timer armed by path.
+
+        Returns True if a timer was still pending.
+        """
+        handle = self._long_press_handles.pop(path, None)
+        if handle is None:
+            return False
+        handle.cancel()
+        return True
 
-    async def _check_long_press(self, device_path, trigger_code):
-        """Trigger at exactly the 1s mark if key is still held."""
-        await asyncio.sleep(LONG_PRESS_THRESHOLD)
+    async def _toggle_recording(self, device):
+        """Send ToggleRecord for a short press."""
+        print(f"[{device.name}] Toggle Recording.")
         try:
-            dev = InputDevice(device_path)
-            if trigger_code in dev.active_keys():
-                print("Hold detected: Toggling OBS Application.")
-                self.long_press_active = True
-                self.toggle_obs_app()
+            await self._run_blocking(
+                self.client.call,
+                requests.ToggleRecord()
+            )
         except Exception:
-            pass
+            self.connected = False
 
-    async def handle_events(self, device, trigger_code):
+    def _handle_key(self, device, value):
         """Handle the logic for short vs long presses."""
-        press_start_time = 0
+        if value == 1:
+            self._cancel_long_press(device.path)
+            loop = asyncio.get_running_loop()
+            self._long_press_handles[device.path] = loop.call_later(
+                LONG_PRESS_THRESHOLD,
+                self._fire_long_press,
+                device.path
+            )
+        elif value == 0:
+            # Short press only if this device armed a timer that has not
+            # fired yet
+            pending = self._cancel_long_press(device.path)
+            if pending and self.connected:
+                self._spawn(self._toggle_recording(device))
+
+    def _drain(self, device, trigger_code, closed):
+        """Process every event queued on the device in one wakeup."""
         try:
-            async for event in device.async_read_loop():
-                if (event.type == ecodes.EV_KEY and
-                        event.code == trigger_code):
-                    if event.value == 1:
-                        press_start_time = time.time()
-                        self.long_press_active = False
-                        asyncio.create_task(
-                            self._check_long_press(
-                                device.path,
-                                trigger_code
-                            )
-                        )
-                    elif event.value == 0:
-                        if not self.long_press_active:
-                            duration = time.time() - press_start_time
-                            if (duration < LONG_PRESS_THRESHOLD and
-                                    self.connected):
-                                print(
-                                    f"[{device.name}] Toggle Recording."
-                                )
-                                try:
-                                    self.client.call(
-                                        requests.ToggleRecord()
-                                    )
-                                except Exception:
-                                    self.connected = False
-        except (OSError, PermissionError):
+            while True:
+                for event in device.read():
+                    if (event.type == ecodes.EV_KEY and
+                            event.code == trigger_code):
+                        self._handle_key(device, event.value)
+        except BlockingIOError:
             pass
+        except OSError:
+            if not closed.done():
+                closed.set_result(None)
+
+    async def handle_events(self, device, trigger_code):
+        """Read events from device until it goes away."""
+        loop = asyncio.get_running_loop()
+        closed = loop.create_future()
+        loop.add_reader(device.fd, self._drain, device, trigger_code, closed)
+        try:
+            await closed
         finally:
-            self.active_devices.pop(device.path, None)
+            loop.remove_reader(device.fd)
+            self._cancel_long_press(device.path)
+
+    def _forget_device(self, task, path, dev):
+        """Release a device once its monitoring task has finished."""
+        # A replugged device may already own this path again
+        if self.active_devices.get(path) is task:
+            del self.active_devices[path]
+        dev.close()
+
+    def _sysfs_has_code(self, path):
+        """Test the trigger bit in the sysfs key bitmap of an event node.
+
+        Returns None when the bitmap cannot be read.
+        """
+        name = os.path.basename(path)
+        try:
+            with open(f"/sys/class/input/{name}/device/capabilities/key") as f:
+                words = f.read().split()
+        except OSError:
+            return None
+        # Words are printed most significant first, one unsigned long each
+        bits = 0
+        for word in words:
+            bits = (bits << LONG_BITS) | int(word, 16)
+        return bool((bits >> self.args.code) & 1)
+
+    def _monitor_device(self, path):
+        """Start monitoring path if it reports the trigger key."""
+        if (path in self.active_devices or
+                not path.startswith("/dev/input/event")):
+            return
+        supported = self._sysfs_has_code(path)
+        if supported is False:
+            return
+        try:
+            dev = InputDevice(path)
+            if supported is None:
+                # No sysfs bitmap, ask the device instead
+                try:
+                    caps = dev.capabilities()
+                except OSError:
+                    dev.close()
+                    raise
+                supported = (ecodes.EV_KEY in caps and
+                             self.args.code in caps[ecodes.EV_KEY])
+                if not supported:
+                    dev.close()
+                    return
+            print(f"Monitoring: {dev.name}")
+            task = asyncio.create_task(
+                self.handle_events(dev, self.args.code)
+            )
+            task.add_done_callback(
+                lambda t, p=path, d=dev: self._forget_device(t, p, d)
+            )
+            self.active_devices[path] = task
+        except OSError as e:
+            print(f"Cannot open {path}: {e}")
+
+    def _on_udev_event(self, monitor, queue):
+        """Queue event nodes of newly added input devices."""
+        while True:
+            device = monitor.poll(timeout=0)
+            if device is None:
+                return
+            node = device.device_node
+            if (device.action == "add" and node and
+                    node.startswith("/dev/input/event")):
+                queue.put_nowait(node)
 
     async def watch_devices(self):
         """Watch for newly plugged-in hardware."""
-        while True:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by("input")
+        monitor.start()
+        queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        loop.add_reader(
+            monitor.fileno(),
+            self._on_udev_event,
+            monitor,
+            queue
+        )
+        try:
+            # Pick up devices that were plugged in before startup
             for path in evdev.list_devices():
-                if path not in self.active_devices:
-                    try:
-                        dev = InputDevice(path)
-                        caps = dev.capabilities()
-                        if (ecodes.EV_KEY in caps and
-                                self.args.code in caps[ecodes.EV_KEY]):
-                            print(f"Monitoring: {dev.name}")
-                            task = asyncio.create_task(
-                                self.handle_events(dev, self.args.code)
-                            )
-                            self.active_devices[path] = task
-                        else:
-                            dev.close()
-                    except (OSError, PermissionError):
-                        continue
-            await asyncio.sleep(2)
+                self._monitor_device(path)
+            while True:
+                self._monitor_device(await queue.get())
+        finally:
+            loop.remove_reader(monitor.fileno())
 
 
 async def main():
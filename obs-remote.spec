@@ -14,7 +14,7 @@ a = Analysis(
         'obswebsocket.requests',
         'evdev',
         'evdev.ecodes',
-        'psutil',
+        'pyudev',
     ],
     hookspath=[],
     hooksconfig={},